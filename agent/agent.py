@@ -1,5 +1,6 @@
 import asyncio
 import logging
+import os
 
 from dotenv import load_dotenv
 
@@ -15,7 +16,6 @@ from livekit.agents import (
     cli,
     llm,
     room_io,
-    utils,
     function_tool,
 )
 from livekit.plugins import deepgram, openai, silero
@@ -23,7 +23,20 @@ import json
 import time
 import uuid
 from livekit.agents.tts import SynthesizedAudio
-from typing import AsyncIterable
+from typing import Any, AsyncIterable
+
+from dense import DENSE_MODE, create_server, request_fnc, rooms, shared_resource
+from image_cache import ImageCache, default_image_backend
+from ingress import ChatIngress, RateLimiter, rate_limited_error
+from llm_scheduler import (
+    SCHEDULED_CONN_OPTIONS,
+    LLMScheduler,
+    Priority,
+    limits_from_env,
+)
+from supervisor import TaskSupervisor
+from transcript import TranscriptStore, chat_context_bytes
+from tool_executor import ToolExecutor, collect_turn
 
 
 server = AgentServer()
@@ -33,42 +46,22 @@ load_dotenv()
 
 logger = logging.getLogger("transcriber")
 
+# Scenes the scenario is known to visit; images are generated ahead of time
+# so the coordinator doesn't stall on the image API mid-turn. The model picks
+# one with generate_image's scene_id, which maps to the exact prefetched prompt.
+SCENARIO_SCENES = {
+    "tavern": "A warm, crowded fantasy tavern lit by candles, adventurers gathered around a table",
+    "dungeon_entrance": "The dark stone entrance of an ancient dungeon, torches flickering at the gate",
+}
+
 
 # This example demonstrates how to transcribe audio from multiple remote participants.
 # It creates agent sessions for each participant and transcribes their audio.
-def get_combined_chat_context(
-    chat_contexts: dict[str, llm.ChatContext],
-    chat_context: llm.ChatContext | None = None,
-) -> llm.ChatContext:
-    """Get all chat messages from all participants sorted by timestamp."""
-    combined_context = llm.ChatContext()
-    if chat_context:
-        for item in chat_context.items:
-            combined_context.insert(item=item)
-
-    for participant_identity, chat_context in chat_contexts.items():
-        msg = ""
-        if len(chat_context.items) > 0:
-            for item in chat_context.items:
-                msg += (
-                    item.content
-                    if isinstance(item.content, str)
-                    else " ".join(item.content)
-                ) + "\n"
-        combined_context.add_message(
-            role="user",
-            content=f"Participant Name: {participant_identity}\nMessage: ```{msg}```",
-            created_at=item.created_at,
-        )
-
-    return combined_context
-
-
 class Transcriber(Agent):
     def __init__(
         self,
         participant_identity: str,
-        chat_context: llm.ChatContext,
+        transcript: TranscriptStore,
         room: rtc.Room,
         coordinator,
     ):
@@ -77,7 +70,7 @@ class Transcriber(Agent):
             stt=deepgram.STT(),
         )
         self.participant_identity = participant_identity
-        self.chat_context = chat_context
+        self.transcript = transcript
         self.room = room
         self.coordinator = coordinator
 
@@ -87,14 +80,11 @@ class Transcriber(Agent):
         user_transcript = new_message.text_content
 
         # Maintain chat context by appending the user's message
-        self.chat_context.add_message(
-            role="user",
-            content=user_transcript,
-        )
+        await self.transcript.append(self.participant_identity, user_transcript)
 
         logger.info(f"[{self.participant_identity}] User said: {user_transcript}")
         logger.info(
-            f"[{self.participant_identity}] Chat context now has {len(self.chat_context.items)} messages"
+            f"[{self.participant_identity}] Transcript now has {len(self.transcript)} messages"
         )
 
         # Broadcast finalized transcript via RPC
@@ -114,12 +104,16 @@ class Transcriber(Agent):
 
 
 class Coordinator:
-    def __init__(self, ctx, sessions, chat_contexts):
+    def __init__(
+        self, ctx, sessions, transcript: TranscriptStore, supervisor: TaskSupervisor
+    ):
         self.sessions = sessions
-        self._chat_contexts = chat_contexts
+        self._supervisor = supervisor
+        self._transcript = transcript
         self.ctx = ctx
         self.room = ctx.room
         self.llm = openai.LLM(model="gpt-4o")
+        self.tts = deepgram.TTS()
         self.chat_ctx = llm.ChatContext()
         self.chat_ctx.add_message(
             role="system",
@@ -128,25 +122,49 @@ class Coordinator:
                 "Engage the participants, describe the scene, and use your tools to make it interactive. "
                 "You can send private messages, polls, popups, and generate images using tool calls "
                 "Please respond with only plain text paragraph without markdown formatting "
-                "Respond with maximum of 5 sentences"
+                "Respond with maximum of 5 sentences. "
+                "When showing one of these known scenes, call generate_image with its scene_id "
+                f"instead of writing a prompt: {', '.join(SCENARIO_SCENES)}"
             ),
         )
         self.last_activity = time.time()
         self.processing = False
-        self._task = None
         self.active_poll = None
         self.waiting_for_user = False  # Wait for user input after coordinator speaks
+        self.silence_timeout = 5.0
+        self.image_cache: ImageCache = ctx.proc.userdata["image_cache"]
+        self._llm_scheduler: LLMScheduler = ctx.proc.userdata["llm_scheduler"]
+        self.max_tool_rounds = 3
+        self.tool_executor = ToolExecutor(
+            llm.find_function_tools(self),
+            default_timeout=10.0,
+            timeouts={"generate_image": 45.0},
+            batch_handlers={"send_private_message": self._send_private_messages},
+            # create_poll mutates active_poll and the rest reach every player's
+            # screen, so they run one at a time in the order the model asked
+            sequential={
+                "create_poll",
+                "broadcast_message",
+                "show_popup",
+                "start_game",
+                "generate_image",
+            },
+        )
 
     def start(self):
-        self._task = asyncio.create_task(self.run_loop())
+        self._supervisor.create_task(self.run_loop(), kind="coordinator")
+        self._supervisor.create_task(
+            self.prefetch_images(list(SCENARIO_SCENES.values())),
+            kind="image_prefetch",
+        )
+
+    async def prefetch_images(self, prompts: list[str]):
+        """Pre-generate scenario images so later generate_image calls hit the cache."""
+        logger.info(f"Prefetching {len(prompts)} scenario images")
+        await self.image_cache.prefetch(prompts)
 
     async def stop(self):
-        if self._task:
-            self._task.cancel()
-            try:
-                await self._task
-            except asyncio.CancelledError:
-                pass
+        await self._supervisor.cancel("coordinator", "image_prefetch", "poll", "tts")
 
     def on_activity(self, participant_identity: str, text: str):
         self.last_activity = time.time()
@@ -157,18 +175,24 @@ class Coordinator:
         audio_source = rtc.AudioSource(44100, 1)
 
         track = rtc.LocalAudioTrack.create_audio_track("agent-audio", audio_source)
-        await self.room.local_participant.publish_track(track)
+        publication = await self.room.local_participant.publish_track(track)
 
-        tts = deepgram.TTS()
-        tts_stream = tts.stream()
+        tts_stream = self.tts.stream()
 
         async def send_audio(audio_stream: AsyncIterable[SynthesizedAudio]):
-            async for a in audio_stream:
-                await audio_source.capture_frame(a.audio.frame)
+            try:
+                async for a in audio_stream:
+                    await audio_source.capture_frame(a.audio.frame)
+                await audio_source.wait_for_playout()
+            finally:
+                # Release the track and source so finished utterances don't pile up
+                await tts_stream.aclose()
+                await self.room.local_participant.unpublish_track(publication.sid)
+                await audio_source.aclose()
 
         # create a task to consume and publish audio frames
         tts_stream.push_text(text)
-        asyncio.create_task(send_audio(tts_stream))
+        self._supervisor.create_task(send_audio(tts_stream), kind="tts")
 
         # push text into the stream, TTS stream will emit audio frames along with events
         # indicating sentence (or segment) boundaries.
@@ -184,31 +208,51 @@ class Coordinator:
             # Check for silence (3 seconds)
             # Only check if we are NOT waiting for user input
 
-            if not self.waiting_for_user and time.time() - self.last_activity > 5.0:
+            if not self.waiting_for_user and time.time() - self.last_activity > self.silence_timeout:
                 logger.info("Silence detected, triggering Coordinator")
                 self.processing = True
                 try:
-                    # Generate response
-                    new_chat = get_combined_chat_context(
-                        self._chat_contexts, self.chat_ctx
-                    )
-
-                    stream = self.llm.chat(
-                        chat_ctx=new_chat,
-                        tools=[
-                            # self.send_private_message,
-                            # self.broadcast_message,
-                            # self.create_poll,
-                            # self.show_popup,
-                        ],
-                        # TODO: ADD tools here
-                    )
-
-                    response_text = ""
-                    async for chunk in stream:
-                        if chunk.delta and chunk.delta.content:
-                            response_text += chunk.delta.content
-
+                    response_parts: list[str] = []
+                    for tool_round in range(self.max_tool_rounds + 1):
+                        # Generate response
+                        new_chat = self._transcript.to_chat_context(self.chat_ctx)
+                        # Final round must produce text, so offer no tools
+                        tools = (
+                            self.tool_executor.tools
+                            if tool_round < self.max_tool_rounds
+                            else []
+                        )
+                        turn = await self._llm_scheduler.run(
+                            self.llm.model,
+                            Priority.INTERACTIVE,
+                            lambda: collect_turn(
+                                self.llm.chat(
+                                    chat_ctx=new_chat,
+                                    tools=tools,
+                                    conn_options=SCHEDULED_CONN_OPTIONS,
+                                )
+                            ),
+                        )
+                        if turn.text.strip():
+                            response_parts.append(turn.text.strip())
+
+                        if not turn.tool_calls:
+                            break
+
+                        # Run the requested tools and feed their output back
+                        # so the model can follow up on the results
+                        outputs = await self.tool_executor.execute(turn.tool_calls)
+                        for call, output in zip(turn.tool_calls, outputs):
+                            self.chat_ctx.items.append(
+                                llm.FunctionCall(
+                                    call_id=call.call_id,
+                                    name=call.name,
+                                    arguments=call.arguments,
+                                )
+                            )
+                            self.chat_ctx.items.append(output)
+
+                    response_text = " ".join(response_parts)
                     if response_text:
                         await self.room.local_participant.send_text(
                             text=json.dumps(
@@ -294,6 +338,27 @@ class Coordinator:
         )
         return f"Message sent to {identity}"
 
+    async def _send_private_messages(self, calls: list[dict[str, Any]]) -> list[str]:
+        """Batch handler for send_private_message: one send per distinct message."""
+        recipients: dict[str, list[str]] = {}
+        for call in calls:
+            recipients.setdefault(call["message"], []).append(call["identity"])
+
+        await asyncio.gather(
+            *[
+                self.room.local_participant.send_text(
+                    text=json.dumps({"type": "private_message", "message": message}),
+                    topic="coordinator_private",
+                    destination_identities=identities,
+                )
+                for message, identities in recipients.items()
+            ]
+        )
+        logger.info(
+            f"Sent {len(recipients)} private message(s) to {len(calls)} recipient(s)"
+        )
+        return [f"Message sent to {call['identity']}" for call in calls]
+
     @function_tool(description="Broadcast a message to all users")
     async def broadcast_message(self, message: str):
         """Broadcast a message to all participants."""
@@ -307,6 +372,10 @@ class Coordinator:
     @function_tool(description="Create a poll for users to vote on")
     async def create_poll(self, question: str, options: list[str], timeout: int = 30):
         """Create a poll with a question and a list of options. Timeout in seconds (default 30)."""
+        if self.active_poll:
+            raise llm.ToolError(
+                "A poll is already running, wait for its results before creating another"
+            )
         logger.info(f"Creating poll: {question} - {options} (timeout: {timeout}s)")
 
         poll_id = str(uuid.uuid4())
@@ -335,7 +404,9 @@ class Coordinator:
         )
 
         # Start a background task to finalize the poll after timeout
-        asyncio.create_task(self.wait_for_poll_end(poll_id, timeout))
+        self._supervisor.create_task(
+            self.wait_for_poll_end(poll_id, timeout), kind="poll", name=f"poll-{poll_id}"
+        )
 
         return f"Poll created with ID {poll_id}. Waiting for responses."
 
@@ -362,13 +433,21 @@ class Coordinator:
         return "Game started"
 
     @function_tool(description="Generate an image and show it to everyone")
-    async def generate_image(self, prompt: str, subtitle: str):
-        """Generate an image based on a prompt and show it with a subtitle."""
+    async def generate_image(
+        self, prompt: str, subtitle: str, scene_id: str | None = None
+    ):
+        """Generate an image based on a prompt and show it with a subtitle.
+
+        Args:
+            prompt: Description of the image to generate.
+            subtitle: Caption shown under the image.
+            scene_id: Id of a known scenario scene; its prepared image is shown instead of the prompt.
+        """
+        if scene_id in SCENARIO_SCENES:
+            prompt = SCENARIO_SCENES[scene_id]
         logger.info(f"Generating image for: {prompt}")
-        # Placeholder for actual generation
-        # Using a reliable placeholder service
-        encoded_prompt = utils.http.url_encode(prompt)
-        image_url = f"https://placehold.co/600x400?text={encoded_prompt}"
+        image = await self.image_cache.get(prompt)
+        image_url = image.to_data_url()
 
         await self.room.local_participant.send_text(
             text=json.dumps({"type": "image", "url": image_url, "subtitle": subtitle}),
@@ -381,14 +460,26 @@ class MultiUserTranscriber:
     def __init__(self, ctx: JobContext):
         self.ctx = ctx
         self._sessions: dict[str, AgentSession] = {}
-        self._chat_contexts: dict[str, llm.ChatContext] = {}
-        self._tasks: set[asyncio.Task] = set()
-        self.coordinator = Coordinator(ctx, self._sessions, self._chat_contexts)
+        self._pending_starts: dict[str, asyncio.Task] = {}
+        self._transcript = TranscriptStore(
+            max_memory_bytes=int(
+                os.getenv("ROOM_TRANSCRIPT_MAX_BYTES", 4 * 1024 * 1024)
+            ),
+            spill_dir=os.getenv("TRANSCRIPT_SPILL_DIR"),
+        )
+        self._supervisor = TaskSupervisor(ctx.job.room.name)
+        self.coordinator = Coordinator(
+            ctx, self._sessions, self._transcript, self._supervisor
+        )
+        self._chat_ingress = ChatIngress(self._process_messages, self._supervisor)
+        self._poll_limiter = RateLimiter(rate=1.0, burst=3)
+        self._chat_activity: dict[str, float] = {}
 
     def start(self):
         self.ctx.room.on("participant_connected", self.on_participant_connected)
         self.ctx.room.on("participant_disconnected", self.on_participant_disconnected)
         self.coordinator.start()
+        self._supervisor.create_task(self._report_stats(), kind="stats")
 
     def register_rpc_methods(self):
         """Register RPC methods after room connection."""
@@ -405,13 +496,50 @@ class MultiUserTranscriber:
             "Registered RPC methods: summarize_meeting, add_message, submit_poll_response"
         )
 
-    def get_chat_context(self, participant_identity: str) -> llm.ChatContext | None:
+    def get_chat_context(self, participant_identity: str) -> llm.ChatContext:
         """Get the chat context for a specific participant."""
-        return self._chat_contexts.get(participant_identity)
+        return self._transcript.to_chat_context(speaker=participant_identity)
+
+    async def get_combined_chat_context(self) -> llm.ChatContext:
+        """Get all chat messages from all participants, including spilled ones."""
+        return await self._transcript.to_full_chat_context()
+
+    def get_memory_usage(self) -> dict[str, int]:
+        """Get the memory accounting for this room, for monitoring.
+
+        Covers the transcript store and the coordinator's own context (its
+        turns, tool calls and outputs, poll results), which is not spilled.
+        """
+        usage = self._transcript.memory_stats()
+        usage["coordinator_bytes"] = chat_context_bytes(self.coordinator.chat_ctx)
+        usage["total_bytes"] = usage["memory_bytes"] + usage["coordinator_bytes"]
+        return usage
+
+    def get_task_counts(self) -> dict[str, int]:
+        """Get the number of live background tasks per kind, for monitoring."""
+        return self._supervisor.counts()
+
+    def get_room_stats(self) -> dict:
+        """Get all monitoring stats for this room."""
+        return {
+            "tasks": self.get_task_counts(),
+            "task_failures": self._supervisor.failures(),
+            "memory": self.get_memory_usage(),
+            "llm": self.get_llm_metrics(),
+        }
 
-    def get_all_chat_contexts(self) -> dict[str, llm.ChatContext]:
-        """Get all chat contexts for all participants."""
-        return self._chat_contexts.copy()
+    async def _report_stats(self):
+        """Periodically log the room's stats so operators can watch them."""
+        interval = float(os.getenv("ROOM_STATS_INTERVAL", "60"))
+        while True:
+            await asyncio.sleep(interval)
+            logger.info(
+                f"[{self._supervisor.name}] room stats: {json.dumps(self.get_room_stats())}"
+            )
+
+    def get_llm_metrics(self) -> dict:
+        """Get the process-wide LLM queue depth and wait time metrics."""
+        return self.ctx.proc.userdata["llm_scheduler"].metrics()
 
     async def handle_summarize_request(self, data: rtc.RpcInvocationData) -> str:
         """Handle RPC request to summarize the meeting."""
@@ -419,7 +547,7 @@ class MultiUserTranscriber:
             logger.info(f"Received summarization request from {data.caller_identity}")
 
             # Get all messages sorted by timestamp
-            all_messages = get_combined_chat_context(self._chat_contexts)
+            all_messages = await self.get_combined_chat_context()
 
             if len(all_messages.items) == 0:
                 return "No conversation has occurred yet."
@@ -452,13 +580,18 @@ Conversation:
                 """,
             )
 
-            # Generate summary
-            summary_stream = llm_instance.chat(chat_ctx=summary_context)
-            summary_text = ""
-
-            async for chunk in summary_stream:
-                if chunk.delta and chunk.delta.content:
-                    summary_text += chunk.delta.content
+            # Generate summary, yielding to interactive coordinator turns
+            llm_scheduler: LLMScheduler = self.ctx.proc.userdata["llm_scheduler"]
+            summary = await llm_scheduler.run(
+                llm_instance.model,
+                Priority.SUMMARY,
+                lambda: collect_turn(
+                    llm_instance.chat(
+                        chat_ctx=summary_context, conn_options=SCHEDULED_CONN_OPTIONS
+                    )
+                ),
+            )
+            summary_text = summary.text
 
             logger.info(f"Summary generated successfully for {data.caller_identity}")
             return summary_text
@@ -479,42 +612,53 @@ Conversation:
             if not message_text:
                 return json.dumps({"error": "Message is required"})
 
-            # Get or create chat context for this participant
-            if participant_identity not in self._chat_contexts:
-                self._chat_contexts[participant_identity] = llm.ChatContext()
-                logger.info(f"Created new chat context for {participant_identity}")
-
-            chat_context = self._chat_contexts[participant_identity]
-
-            # Add message to context
-            chat_context.add_message(
-                role="user",
-                content=f"Participant Name: {participant_identity}\nMessage: ```{message_text}```",
-            )
-            await self.ctx.room.local_participant.send_text(
-                text=json.dumps(
-                    {
-                        "speaker": participant_identity,
-                        "text": message_text,
-                        "timestamp": int(time.time() * 1000),
-                    }
-                ),
-                topic="transcription",
-            )
-
-            # Notify Coordinator of activity
-            self.coordinator.on_activity(participant_identity, message_text)
-
-            logger.info(f"[{participant_identity}] Added text message: {message_text}")
-            logger.info(
-                f"[{participant_identity}] Chat context now has {len(chat_context.items)} messages"
-            )
+            # Queue the message; the context insert and broadcast happen off the
+            # RPC path so a flooding client gets a fast rejection instead
+            if retry_after := self._chat_ingress.submit(
+                participant_identity, message_text
+            ):
+                logger.warning(f"[{participant_identity}] Rate limited add_message")
+                raise rate_limited_error(retry_after)
 
             return json.dumps({"success": True})
+        except rtc.RpcError:
+            raise
         except Exception as e:
             logger.error(f"Error adding message: {e}")
             return json.dumps({"error": str(e)})
 
+    async def _process_messages(self, participant_identity: str, messages: list[str]):
+        """Add a coalesced burst of chat messages to context and broadcast it."""
+        message_text = "\n".join(messages)
+
+        await self._transcript.append(participant_identity, message_text)
+        await self.ctx.room.local_participant.send_text(
+            text=json.dumps(
+                {
+                    "speaker": participant_identity,
+                    "text": message_text,
+                    "timestamp": int(time.time() * 1000),
+                }
+            ),
+            topic="transcription",
+        )
+
+        # Notify Coordinator of activity, but let each participant's chat hold
+        # the silence timer off for at most one window so a spamming client
+        # can't keep the coordinator quiet forever
+        now = time.time()
+        last_reset = self._chat_activity.get(participant_identity, 0.0)
+        if now - last_reset >= self.coordinator.silence_timeout:
+            self._chat_activity[participant_identity] = now
+            self.coordinator.on_activity(participant_identity, message_text)
+
+        logger.info(
+            f"[{participant_identity}] Added {len(messages)} text message(s): {message_text}"
+        )
+        logger.info(
+            f"[{participant_identity}] Transcript now has {len(self._transcript)} messages"
+        )
+
     async def handle_poll_response(self, data: rtc.RpcInvocationData) -> str:
         """Handle RPC request to submit a poll response."""
         try:
@@ -526,15 +670,22 @@ Conversation:
             if not answer:
                 return json.dumps({"error": "Answer is required"})
 
+            if retry_after := self._poll_limiter.try_acquire(data.caller_identity):
+                logger.warning(f"[{data.caller_identity}] Rate limited poll response")
+                raise rate_limited_error(retry_after)
+
             await self.coordinator.handle_poll_response(data.caller_identity, answer)
             return json.dumps({"success": True})
+        except rtc.RpcError:
+            raise
         except Exception as e:
             logger.error(f"Error submitting poll response: {e}")
             return json.dumps({"error": str(e)})
 
     async def aclose(self):
         await self.coordinator.stop()
-        await utils.aio.cancel_and_wait(*self._tasks)
+        await self._chat_ingress.aclose()
+        await self._supervisor.aclose()
 
         await asyncio.gather(
             *[self._close_session(session) for session in self._sessions.values()]
@@ -543,69 +694,99 @@ Conversation:
         self.ctx.room.off("participant_connected", self.on_participant_connected)
         self.ctx.room.off("participant_disconnected", self.on_participant_disconnected)
 
+        logger.info(f"transcript memory at close: {self._transcript.memory_stats()}")
+        self._transcript.close()
+
     def on_participant_connected(self, participant: rtc.RemoteParticipant):
-        if participant.identity in self._sessions:
+        if (
+            participant.identity in self._sessions
+            or participant.identity in self._pending_starts
+        ):
             return
 
         logger.info(f"starting session for {participant.identity}")
-        task = asyncio.create_task(self._start_session(participant))
-        self._tasks.add(task)
+        task = self._supervisor.create_task(
+            self._start_session(participant),
+            kind="session_start",
+            name=f"start-{participant.identity}",
+        )
+        self._pending_starts[participant.identity] = task
 
         def on_task_done(task: asyncio.Task):
-            try:
+            pending = self._pending_starts.get(participant.identity) is task
+            if pending:
+                del self._pending_starts[participant.identity]
+            # Failures are logged by the supervisor
+            if task.cancelled() or task.exception() is not None:
+                return
+            if pending:
                 self._sessions[participant.identity] = task.result()
-            finally:
-                self._tasks.discard(task)
+                return
+            # The participant left after the start finished but before this
+            # callback ran, so cancelling the start had no effect
+            logger.info(f"closing session for {participant.identity}, who already left")
+            self._supervisor.create_task(
+                self._close_session(task.result()),
+                kind="session_close",
+                name=f"close-{participant.identity}",
+            )
 
         task.add_done_callback(on_task_done)
 
     def on_participant_disconnected(self, participant: rtc.RemoteParticipant):
+        # Don't let a start that finishes after the participant left keep a
+        # session alive until the room closes
+        if (task := self._pending_starts.pop(participant.identity, None)) is not None:
+            logger.info(f"cancelling session start for {participant.identity}")
+            task.cancel()
+
+        # A participant can chat before their session has started, or after it
+        # failed to start, so drop their chat state whether or not they have one
+        self._chat_ingress.remove(participant.identity)
+        self._poll_limiter.remove(participant.identity)
+        self._chat_activity.pop(participant.identity, None)
+
         if (session := self._sessions.pop(participant.identity, None)) is None:
             return
 
-        # Clean up chat context for disconnected participant
-        chat_context = self._chat_contexts.pop(participant.identity, None)
-        if chat_context:
-            logger.info(
-                f"cleaned up chat context for {participant.identity} ({len(chat_context.items)} messages)"
-            )
-
         logger.info(f"closing session for {participant.identity}")
-        task = asyncio.create_task(self._close_session(session))
-        self._tasks.add(task)
-        task.add_done_callback(lambda _: self._tasks.discard(task))
+        self._supervisor.create_task(
+            self._close_session(session),
+            kind="session_close",
+            name=f"close-{participant.identity}",
+        )
 
     async def _start_session(self, participant: rtc.RemoteParticipant) -> AgentSession:
         if participant.identity in self._sessions:
             return self._sessions[participant.identity]
 
-        # Initialize chat context for this participant
-        chat_context = llm.ChatContext()
-        self._chat_contexts[participant.identity] = chat_context
-        logger.info(f"initialized chat context for {participant.identity}")
-
         session = AgentSession(
             vad=self.ctx.proc.userdata["vad"],
         )
-        await session.start(
-            agent=Transcriber(
-                participant_identity=participant.identity,
-                chat_context=chat_context,
+        try:
+            await session.start(
+                agent=Transcriber(
+                    participant_identity=participant.identity,
+                    transcript=self._transcript,
+                    room=self.ctx.room,
+                    coordinator=self.coordinator,
+                ),
                 room=self.ctx.room,
-                coordinator=self.coordinator,
-            ),
-            room=self.ctx.room,
-            room_options=room_io.RoomOptions(
-                audio_input=True,
-                text_output=True,
-                audio_output=True,
-                participant_identity=participant.identity,
-                # text input is not supported for multiple room participants
-                # if needed, register the text stream handler by yourself
-                # and route the text to different sessions based on the participant identity
-                text_input=False,
-            ),
-        )
+                room_options=room_io.RoomOptions(
+                    audio_input=True,
+                    text_output=True,
+                    audio_output=True,
+                    participant_identity=participant.identity,
+                    # text input is not supported for multiple room participants
+                    # if needed, register the text stream handler by yourself
+                    # and route the text to different sessions based on the participant identity
+                    text_input=False,
+                ),
+            )
+        except asyncio.CancelledError:
+            # The participant left mid-start; release what was already set up
+            await session.aclose()
+            raise
         return session
 
     async def _close_session(self, sess: AgentSession) -> None:
@@ -613,11 +794,25 @@ Conversation:
         await sess.aclose()
 
 
-server = AgentServer()
+server = create_server()
 
 
-@server.rtc_session(agent_name="transcriber-agent")
+@server.rtc_session(
+    agent_name="transcriber-agent",
+    # In dense mode, room capacity is enforced when the job is offered
+    on_request=request_fnc if DENSE_MODE else None,
+)
 async def entrypoint(ctx: JobContext):
+    # Count the job against this process' capacity until it shuts down, however
+    # it ends. In dense mode request_fnc has already claimed the slot.
+    job_id = ctx.job.id
+    rooms.try_add(job_id)
+
+    async def release_room():
+        rooms.remove(job_id)
+
+    ctx.add_shutdown_callback(release_room)
+
     transcriber = MultiUserTranscriber(ctx)
     await ctx.connect()
     await ctx.wait_for_participant()
@@ -637,7 +832,24 @@ async def entrypoint(ctx: JobContext):
 
 
 def prewarm(proc: JobProcess):
-    proc.userdata["vad"] = silero.VAD.load()
+    # In dense mode every room runs in this process, so load models once
+    proc.userdata["vad"] = shared_resource("vad", silero.VAD.load)
+    proc.userdata["llm_scheduler"] = shared_resource(
+        "llm_scheduler",
+        lambda: LLMScheduler(
+            limits=limits_from_env(),
+            default_limit=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+        ),
+    )
+    proc.userdata["image_cache"] = shared_resource(
+        "image_cache",
+        lambda: ImageCache(
+            default_image_backend(),
+            cache_dir=os.getenv(
+                "IMAGE_CACHE_DIR", os.path.expanduser("~/.cache/agent-images")
+            ),
+        ),
+    )
 
 
 server.setup_fnc = prewarm
@@ -0,0 +1,95 @@
+import logging
+import os
+import threading
+from typing import Any, Callable, TypeVar
+
+from livekit.agents import AgentServer, JobExecutorType, JobRequest
+
+logger = logging.getLogger("transcriber")
+
+T = TypeVar("T")
+
+# Dense mode runs every room as a thread job inside one worker process instead
+# of one process per room, so the interpreter, models and caches are shared.
+DENSE_MODE = os.getenv("AGENT_DENSE_MODE", "0") == "1"
+MAX_ROOMS_PER_PROCESS = int(os.getenv("AGENT_MAX_ROOMS_PER_PROCESS", "16"))
+
+_shared: dict[str, Any] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_resource(name: str, factory: Callable[[], T]) -> T:
+    """Create a process-wide resource once and hand the same instance to every room.
+
+    Only loop-agnostic objects (models, caches) belong here; provider clients
+    hold connections bound to the event loop of the room that created them.
+    """
+    with _shared_lock:
+        if name not in _shared:
+            logger.info(f"Loading shared resource: {name}")
+            _shared[name] = factory()
+        return _shared[name]
+
+
+class RoomCounter:
+    """Counts the room jobs hosted by this process and reports it as worker load.
+
+    Jobs are keyed by job id: a room can be dispatched more than once, and
+    each dispatch is a separate job using its own share of the process.
+    """
+
+    def __init__(self, max_rooms: int):
+        self.max_rooms = max_rooms
+        self._jobs: set[str] = set()
+        self._lock = threading.Lock()
+
+    def try_add(self, job_id: str) -> bool:
+        """Claim a slot for job_id; False if the process is already full."""
+        with self._lock:
+            if job_id not in self._jobs and len(self._jobs) >= self.max_rooms:
+                return False
+            self._jobs.add(job_id)
+            logger.info(f"Hosting {len(self._jobs)}/{self.max_rooms} rooms")
+            return True
+
+    def remove(self, job_id: str):
+        with self._lock:
+            self._jobs.discard(job_id)
+
+    def load(self) -> float:
+        with self._lock:
+            return min(len(self._jobs) / self.max_rooms, 1.0)
+
+
+rooms = RoomCounter(MAX_ROOMS_PER_PROCESS)
+
+
+async def request_fnc(req: JobRequest):
+    """Accept a job only if this process has room for it.
+
+    load_fnc is only sampled periodically, so jobs dispatched in between would
+    otherwise be accepted past MAX_ROOMS_PER_PROCESS.
+    """
+    if not rooms.try_add(req.id):
+        logger.warning(f"Rejecting job {req.id}: hosting {rooms.max_rooms} rooms already")
+        await req.reject()
+        return
+    try:
+        await req.accept()
+    except Exception:
+        rooms.remove(req.id)
+        raise
+
+
+def create_server() -> AgentServer:
+    if not DENSE_MODE:
+        return AgentServer()
+
+    logger.info(f"Dense mode enabled, up to {MAX_ROOMS_PER_PROCESS} rooms per process")
+    # The worker stops accepting jobs once load reaches the threshold,
+    # i.e. when this process hosts MAX_ROOMS_PER_PROCESS rooms
+    return AgentServer(
+        job_executor_type=JobExecutorType.THREAD,
+        load_fnc=rooms.load,
+        load_threshold=1.0,
+    )
@@ -0,0 +1,259 @@
+import asyncio
+import base64
+import hashlib
+import html
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Protocol
+
+import httpx
+
+logger = logging.getLogger("transcriber")
+
+
+@dataclass
+class GeneratedImage:
+    data: bytes
+    mime_type: str
+
+    def to_data_url(self) -> str:
+        """Encode the image so it can be sent inline to the UI as an img src."""
+        return f"data:{self.mime_type};base64,{base64.b64encode(self.data).decode()}"
+
+
+class ImageBackend(Protocol):
+    name: str
+
+    async def generate(self, prompt: str, **params: Any) -> GeneratedImage: ...
+
+
+class PlaceholderImageBackend:
+    """Local stand-in that renders the prompt into an SVG, no network needed."""
+
+    name = "placeholder"
+
+    async def generate(self, prompt: str, **params: Any) -> GeneratedImage:
+        width, height = params.get("width", 600), params.get("height", 400)
+        svg = (
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}">'
+            f'<rect width="100%" height="100%" fill="#ddd"/>'
+            f'<text x="50%" y="50%" font-size="20" text-anchor="middle" fill="#555">'
+            f"{html.escape(prompt)}</text></svg>"
+        )
+        return GeneratedImage(data=svg.encode(), mime_type="image/svg+xml")
+
+
+class GeminiImageBackend:
+    """Generates images with the Gemini image model over the REST API."""
+
+    name = "gemini"
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gemini-2.5-flash-image",
+        timeout: float = 60.0,
+    ):
+        self._api_key = api_key
+        self._model = model
+        self._timeout = timeout
+
+    async def generate(self, prompt: str, **params: Any) -> GeneratedImage:
+        body: dict[str, Any] = {"contents": [{"parts": [{"text": prompt}]}]}
+        if aspect_ratio := params.get("aspect_ratio"):
+            body["generationConfig"] = {"imageConfig": {"aspectRatio": aspect_ratio}}
+
+        async with httpx.AsyncClient(timeout=self._timeout) as client:
+            response = await client.post(
+                f"https://generativelanguage.googleapis.com/v1beta/models/{self._model}:generateContent",
+                headers={"x-goog-api-key": self._api_key},
+                json=body,
+            )
+            response.raise_for_status()
+
+        for candidate in response.json().get("candidates", []):
+            for part in candidate.get("content", {}).get("parts", []):
+                if inline := part.get("inlineData"):
+                    return GeneratedImage(
+                        data=base64.b64decode(inline["data"]),
+                        mime_type=inline.get("mimeType", "image/png"),
+                    )
+        raise RuntimeError("Image generation returned no image")
+
+
+def default_image_backend() -> ImageBackend:
+    if api_key := os.getenv("GOOGLE_API_KEY"):
+        return GeminiImageBackend(api_key)
+    return PlaceholderImageBackend()
+
+
+def normalize_prompt(prompt: str) -> str:
+    return re.sub(r"\s+", " ", prompt).strip().lower()
+
+
+class ImageCache:
+    """Content-addressed cache in front of an image backend.
+
+    Images are keyed by the normalized prompt, generation params and backend
+    name. A bounded in-memory LRU sits in front of a size-capped disk tier, and
+    concurrent requests for the same key share a single generation.
+
+    One cache may be shared by rooms running on different threads and event
+    loops; generations are only deduplicated within a loop.
+    """
+
+    def __init__(
+        self,
+        backend: ImageBackend,
+        *,
+        cache_dir: str | Path | None = None,
+        max_memory_bytes: int = 64 * 1024 * 1024,
+        max_disk_bytes: int = 1024 * 1024 * 1024,
+        prefetch_concurrency: int = 2,
+    ):
+        self.backend = backend
+        self._cache_dir = Path(cache_dir) if cache_dir else None
+        self._max_memory_bytes = max_memory_bytes
+        self._max_disk_bytes = max_disk_bytes
+        self._prefetch_concurrency = prefetch_concurrency
+        self._memory: OrderedDict[str, GeneratedImage] = OrderedDict()
+        self._memory_bytes = 0
+        self._memory_lock = threading.Lock()
+        self._inflight: dict[
+            tuple[asyncio.AbstractEventLoop, str], asyncio.Task[GeneratedImage]
+        ] = {}
+
+        if self._cache_dir:
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def key_for(self, prompt: str, **params: Any) -> str:
+        material = json.dumps(
+            {
+                "backend": self.backend.name,
+                "prompt": normalize_prompt(prompt),
+                "params": params,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    async def get(self, prompt: str, **params: Any) -> GeneratedImage:
+        """Return the cached image for prompt/params, generating it on a miss."""
+        key = self.key_for(prompt, **params)
+
+        if (image := self._memory_get(key)) is not None:
+            return image
+
+        # Tasks can only be awaited on the loop that created them
+        loop = asyncio.get_running_loop()
+        if (task := self._inflight.get((loop, key))) is None:
+            # The generation runs in its own task so a caller that is cancelled
+            # (e.g. a tool timeout) doesn't abort it for the others waiting
+            task = loop.create_task(self._generate(key, prompt, params))
+            self._inflight[(loop, key)] = task
+            task.add_done_callback(lambda t: self._on_generated(loop, key, t))
+        return await asyncio.shield(task)
+
+    async def _generate(
+        self, key: str, prompt: str, params: dict[str, Any]
+    ) -> GeneratedImage:
+        image = await asyncio.to_thread(self._disk_get, key)
+        if image is None:
+            logger.info(f"Image cache miss, generating: {prompt}")
+            image = await self.backend.generate(prompt, **params)
+            await asyncio.to_thread(self._disk_put, key, image)
+        self._memory_put(key, image)
+        return image
+
+    def _on_generated(
+        self, loop: asyncio.AbstractEventLoop, key: str, task: asyncio.Task
+    ) -> None:
+        if self._inflight.get((loop, key)) is task:
+            del self._inflight[(loop, key)]
+        # Mark retrieved so a failure nobody waited for is not logged by asyncio
+        if not task.cancelled():
+            task.exception()
+
+    async def prefetch(self, prompts: list[str], **params: Any) -> None:
+        """Generate and cache images ahead of time, e.g. a scenario's known scenes."""
+        sem = asyncio.Semaphore(self._prefetch_concurrency)
+
+        async def _prefetch(prompt: str):
+            async with sem:
+                try:
+                    await self.get(prompt, **params)
+                except Exception as e:
+                    logger.warning(f"Failed to prefetch image '{prompt}': {e}")
+
+        await asyncio.gather(*[_prefetch(prompt) for prompt in prompts])
+
+    def _memory_get(self, key: str) -> GeneratedImage | None:
+        with self._memory_lock:
+            image = self._memory.get(key)
+            if image is not None:
+                self._memory.move_to_end(key)
+            return image
+
+    def _memory_put(self, key: str, image: GeneratedImage) -> None:
+        if len(image.data) > self._max_memory_bytes:
+            return
+        with self._memory_lock:
+            if (old := self._memory.pop(key, None)) is not None:
+                self._memory_bytes -= len(old.data)
+            self._memory[key] = image
+            self._memory_bytes += len(image.data)
+            while self._memory_bytes > self._max_memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted.data)
+
+    def _disk_path(self, key: str) -> Path:
+        assert self._cache_dir is not None
+        return self._cache_dir / key
+
+    def _disk_get(self, key: str) -> GeneratedImage | None:
+        if not self._cache_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            mime_type = path.with_suffix(".mime").read_text()
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        # Touch so disk eviction is least-recently-used rather than oldest-written
+        path.touch()
+        return GeneratedImage(data=data, mime_type=mime_type)
+
+    def _disk_put(self, key: str, image: GeneratedImage) -> None:
+        if not self._cache_dir:
+            return
+        path = self._disk_path(key)
+        path.with_suffix(".mime").write_text(image.mime_type)
+        # Unique per writer, two rooms may generate the same image concurrently
+        tmp = path.parent / f"{key}.{threading.get_ident()}.tmp"
+        tmp.write_bytes(image.data)
+        tmp.replace(path)
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        entries = []
+        for p in self._cache_dir.iterdir():
+            if p.suffix:
+                continue
+            try:
+                entries.append((p.stat(), p))
+            except FileNotFoundError:
+                # Evicted concurrently by another room's cache writer
+                continue
+        total = sum(stat.st_size for stat, _ in entries)
+        for stat, path in sorted(entries, key=lambda e: e[0].st_mtime):
+            if total <= self._max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            path.with_suffix(".mime").unlink(missing_ok=True)
+            total -= stat.st_size
@@ -0,0 +1,125 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Awaitable, Callable
+
+from livekit import rtc
+from livekit.agents import utils
+
+from supervisor import TaskSupervisor
+
+logger = logging.getLogger("transcriber")
+
+# Application RPC error code for over-budget calls (1001-1999 are reserved)
+RATE_LIMITED = 429
+
+
+def rate_limited_error(retry_after: float) -> rtc.RpcError:
+    """RPC error that makes the caller's performRpc reject with a retry hint."""
+    return rtc.RpcError(
+        RATE_LIMITED,
+        "Rate limited",
+        json.dumps({"retry_after": round(retry_after, 2)}),
+    )
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def try_acquire(self) -> float:
+        """Take a token. Returns 0 on success, else seconds until one is available."""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+
+class RateLimiter:
+    """One token bucket per participant identity."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: dict[str, TokenBucket] = {}
+
+    def try_acquire(self, identity: str) -> float:
+        if identity not in self._buckets:
+            self._buckets[identity] = TokenBucket(self.rate, self.burst)
+        return self._buckets[identity].try_acquire()
+
+    def remove(self, identity: str):
+        self._buckets.pop(identity, None)
+
+
+class ChatIngress:
+    """Bounded, rate-limited per-participant queue for incoming chat messages.
+
+    Accepted messages are processed off the RPC path by one worker per
+    participant; messages that arrive within `coalesce_window` of each other
+    are handed to `process` as a single batch.
+    """
+
+    def __init__(
+        self,
+        process: Callable[[str, list[str]], Awaitable[None]],
+        supervisor: TaskSupervisor,
+        *,
+        rate: float = 1.0,
+        burst: int = 5,
+        max_queue: int = 10,
+        coalesce_window: float = 0.5,
+    ):
+        self._process = process
+        self._supervisor = supervisor
+        self._limiter = RateLimiter(rate, burst)
+        self._max_queue = max_queue
+        self._coalesce_window = coalesce_window
+        self._queues: dict[str, asyncio.Queue[str]] = {}
+        self._workers: dict[str, asyncio.Task] = {}
+
+    def submit(self, identity: str, message: str) -> float:
+        """Queue a message. Returns 0 if accepted, else a retry-after in seconds."""
+        queue = self._queues.get(identity)
+        if queue is not None and queue.full():
+            return self._coalesce_window
+        if (retry_after := self._limiter.try_acquire(identity)) > 0:
+            return retry_after
+
+        if queue is None:
+            queue = self._queues[identity] = asyncio.Queue(maxsize=self._max_queue)
+            self._workers[identity] = self._supervisor.create_task(
+                self._run(identity, queue), kind="ingress", name=f"ingress-{identity}"
+            )
+        queue.put_nowait(message)
+        return 0.0
+
+    async def _run(self, identity: str, queue: asyncio.Queue[str]):
+        while True:
+            messages = [await queue.get()]
+            await asyncio.sleep(self._coalesce_window)
+            while not queue.empty():
+                messages.append(queue.get_nowait())
+
+            try:
+                await self._process(identity, messages)
+            except Exception as e:
+                logger.error(f"Error processing messages from {identity}: {e}")
+
+    def remove(self, identity: str):
+        self._limiter.remove(identity)
+        self._queues.pop(identity, None)
+        if (worker := self._workers.pop(identity, None)) is not None:
+            worker.cancel()
+
+    async def aclose(self):
+        await utils.aio.cancel_and_wait(*self._workers.values())
+        self._workers.clear()
+        self._queues.clear()
@@ -0,0 +1,273 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Awaitable, Callable, TypeVar
+
+from livekit.agents import APIConnectOptions, APIError, APIStatusError
+
+logger = logging.getLogger("transcriber")
+
+T = TypeVar("T")
+
+# Scheduled requests must not retry inside the LLM stream: that would hold the
+# slot through the retries and hide 429s behind an APIConnectionError
+SCHEDULED_CONN_OPTIONS = APIConnectOptions(max_retry=0)
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0  # coordinator turns players are waiting on
+    SUMMARY = 1  # late-joiner summaries
+    BACKGROUND = 2  # compaction and other deferred work
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    loop: asyncio.AbstractEventLoop = field(compare=False)
+    future: asyncio.Future[None] = field(compare=False)
+    granted: bool = field(default=False, compare=False)
+    cancelled: bool = field(default=False, compare=False)
+
+
+@dataclass
+class _ModelState:
+    limit: int
+    active: int = 0
+    blocked_until: float = 0.0
+    rate_limited: int = 0
+    waiters: list[_Waiter] = field(default_factory=list)
+
+
+@dataclass
+class _WaitStats:
+    queued: int = 0
+    completed: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+
+_RETRY_AFTER_RE = re.compile(r"try again in (\d+(?:\.\d+)?)\s*(ms|s)", re.IGNORECASE)
+
+
+def _retry_after(e: APIStatusError) -> float | None:
+    """Extract the suggested delay from an OpenAI rate-limit error, if present."""
+    if match := _RETRY_AFTER_RE.search(f"{e.message} {e.body}"):
+        value, unit = float(match.group(1)), match.group(2).lower()
+        return value / 1000 if unit == "ms" else value
+    return None
+
+
+def limits_from_env() -> dict[str, int]:
+    """Parse per-model limits from LLM_CONCURRENCY_LIMITS, e.g. "gpt-4o=8,gpt-4o-mini=4"."""
+    limits = {}
+    for item in os.getenv("LLM_CONCURRENCY_LIMITS", "").split(","):
+        if "=" in item:
+            model, limit = item.split("=", 1)
+            limits[model.strip()] = int(limit)
+    return limits
+
+
+class LLMScheduler:
+    """Process-wide gate for outbound LLM requests.
+
+    Requests wait for a per-model concurrency slot and are admitted in
+    priority order. One slot per model is held back for interactive requests,
+    so a burst of summaries can never fill a model up. A 429 blocks the model
+    for the server's retry-after (or an exponential backoff) before the
+    request is retried; other retryable errors back off that request alone.
+    Requests must be made with SCHEDULED_CONN_OPTIONS so the scheduler sees
+    the errors instead of the stream retrying them internally.
+
+    Rooms in dense mode share one scheduler across threads, so waiters are
+    woken on their own event loop.
+    """
+
+    def __init__(
+        self,
+        *,
+        limits: dict[str, int] | None = None,
+        default_limit: int = 8,
+        max_retries: int = 3,
+        base_backoff: float = 1.0,
+    ):
+        self._limits = limits or {}
+        self._default_limit = default_limit
+        self._max_retries = max_retries
+        self._base_backoff = base_backoff
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._models: dict[str, _ModelState] = {}
+        self._stats = {priority: _WaitStats() for priority in Priority}
+
+    def _state(self, model: str) -> _ModelState:
+        if model not in self._models:
+            self._models[model] = _ModelState(
+                limit=self._limits.get(model, self._default_limit)
+            )
+        return self._models[model]
+
+    async def run(
+        self, model: str, priority: Priority, request: Callable[[], Awaitable[T]]
+    ) -> T:
+        """Run request() once a slot for model is free, retrying on rate limits
+        and other retryable API errors."""
+        # Wait stats cover the whole request, including time spent queued again
+        # after a 429, and are recorded once however many attempts it took
+        wait = 0.0
+        admitted = False
+        try:
+            for attempt in range(self._max_retries + 1):
+                wait += await self._acquire(model, priority)
+                admitted = True
+                retry_in = 0.0
+                try:
+                    return await request()
+                except APIError as e:
+                    rate_limited = (
+                        isinstance(e, APIStatusError) and e.status_code == 429
+                    )
+                    retryable = rate_limited or e.retryable
+                    if not retryable or attempt == self._max_retries:
+                        raise
+                    if rate_limited:
+                        delay = _retry_after(e) or self._base_backoff * 2**attempt
+                        logger.warning(
+                            f"LLM rate limited on {model}, backing off {delay:.2f}s "
+                            f"(attempt {attempt + 1}/{self._max_retries})"
+                        )
+                        with self._lock:
+                            state = self._state(model)
+                            state.rate_limited += 1
+                            state.blocked_until = max(
+                                state.blocked_until, time.monotonic() + delay
+                            )
+                    else:
+                        # Other transient failures only delay this request
+                        retry_in = self._base_backoff * 2**attempt
+                        logger.warning(
+                            f"LLM request to {model} failed, retrying in {retry_in:.2f}s "
+                            f"(attempt {attempt + 1}/{self._max_retries}): {e}"
+                        )
+                finally:
+                    self._release(model)
+                await asyncio.sleep(retry_in)
+            raise AssertionError("unreachable")
+        finally:
+            if admitted:
+                self._record_wait(model, priority, wait)
+
+    def _record_wait(self, model: str, priority: Priority, wait: float):
+        with self._lock:
+            stats = self._stats[priority]
+            stats.completed += 1
+            stats.total_wait += wait
+            stats.max_wait = max(stats.max_wait, wait)
+        if wait > 1.0:
+            logger.info(f"LLM request ({priority.name}) waited {wait:.2f}s for {model}")
+
+    async def _acquire(self, model: str, priority: Priority) -> float:
+        """Wait for a slot on model; returns the time spent waiting."""
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(priority, next(self._seq), loop, loop.create_future())
+        started = time.monotonic()
+
+        with self._lock:
+            state = self._state(model)
+            heapq.heappush(state.waiters, waiter)
+            self._stats[priority].queued += 1
+            self._dispatch(model, state)
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                self._stats[priority].queued -= 1
+                if not waiter.granted:
+                    waiter.cancelled = True
+                elif waiter.future.done() and not waiter.future.cancelled():
+                    # Granted but cancelled before resuming; hand the slot back
+                    self._release_locked(model)
+            raise
+
+        # Hold the slot through a rate-limit block so waiters resume in priority order
+        try:
+            while (delay := self._state(model).blocked_until - time.monotonic()) > 0:
+                await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            with self._lock:
+                self._stats[priority].queued -= 1
+                self._release_locked(model)
+            raise
+
+        with self._lock:
+            self._stats[priority].queued -= 1
+        return time.monotonic() - started
+
+    def _dispatch(self, model: str, state: _ModelState):
+        while state.waiters:
+            waiter = state.waiters[0]
+            if waiter.cancelled or waiter.loop.is_closed():
+                # Nothing can resume a waiter whose room loop is gone
+                heapq.heappop(state.waiters)
+                continue
+            # Keep one slot free for interactive requests
+            reserved = 1 if state.limit > 1 and waiter.priority != Priority.INTERACTIVE else 0
+            if state.active >= state.limit - reserved:
+                return
+            heapq.heappop(state.waiters)
+            try:
+                waiter.loop.call_soon_threadsafe(self._wake, model, waiter)
+            except RuntimeError:
+                # The loop closed after the check above
+                continue
+            waiter.granted = True
+            state.active += 1
+
+    def _wake(self, model: str, waiter: _Waiter):
+        if waiter.future.done():
+            # The waiter was cancelled before the grant landed
+            self._release(model)
+        else:
+            waiter.future.set_result(None)
+
+    def _release(self, model: str):
+        with self._lock:
+            self._release_locked(model)
+
+    def _release_locked(self, model: str):
+        state = self._state(model)
+        state.active -= 1
+        self._dispatch(model, state)
+
+    def metrics(self) -> dict:
+        """Queue depth and wait times per priority, slot usage per model."""
+        with self._lock:
+            return {
+                "priorities": {
+                    priority.name.lower(): {
+                        "queue_depth": stats.queued,
+                        "completed": stats.completed,
+                        "avg_wait": stats.total_wait / stats.completed
+                        if stats.completed
+                        else 0.0,
+                        "max_wait": stats.max_wait,
+                    }
+                    for priority, stats in self._stats.items()
+                },
+                "models": {
+                    model: {
+                        "active": state.active,
+                        "limit": state.limit,
+                        "rate_limited": state.rate_limited,
+                    }
+                    for model, state in self._models.items()
+                },
+            }
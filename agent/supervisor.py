@@ -0,0 +1,58 @@
+import asyncio
+import logging
+from collections import Counter, deque
+from typing import Any, Coroutine
+
+from livekit.agents import utils
+
+logger = logging.getLogger("transcriber")
+
+
+class TaskSupervisor:
+    """Owns the background tasks of a room, grouped by kind.
+
+    Every task is tracked until it finishes, failures are logged and kept for
+    inspection instead of surfacing as "Task exception was never retrieved",
+    and the room's tasks can be cancelled per kind or all at once.
+    """
+
+    def __init__(self, name: str, max_errors: int = 20):
+        self.name = name
+        self._tasks: dict[str, set[asyncio.Task]] = {}
+        self._failures: Counter[str] = Counter()
+        self.errors: deque[tuple[str, BaseException]] = deque(maxlen=max_errors)
+
+    def create_task(
+        self, coro: Coroutine[Any, Any, Any], *, kind: str, name: str | None = None
+    ) -> asyncio.Task:
+        task = asyncio.create_task(coro, name=f"{self.name}:{name or kind}")
+        self._tasks.setdefault(kind, set()).add(task)
+        task.add_done_callback(lambda t: self._on_done(kind, t))
+        return task
+
+    def _on_done(self, kind: str, task: asyncio.Task):
+        self._tasks[kind].discard(task)
+        if task.cancelled() or (exc := task.exception()) is None:
+            return
+        self._failures[kind] += 1
+        self.errors.append((kind, exc))
+        logger.error(f"[{self.name}] task {task.get_name()} failed", exc_info=exc)
+
+    def counts(self) -> dict[str, int]:
+        """Number of live tasks per kind."""
+        return {kind: len(tasks) for kind, tasks in self._tasks.items() if tasks}
+
+    def failures(self) -> dict[str, int]:
+        """Number of failed tasks per kind since the supervisor was created."""
+        return dict(self._failures)
+
+    async def cancel(self, *kinds: str):
+        """Cancel and wait for all live tasks of the given kinds."""
+        tasks = [task for kind in kinds for task in self._tasks.get(kind, ())]
+        await utils.aio.cancel_and_wait(*tasks)
+
+    async def aclose(self):
+        """Cancel and wait for every live task."""
+        if counts := self.counts():
+            logger.info(f"[{self.name}] cancelling background tasks: {counts}")
+        await self.cancel(*self._tasks)
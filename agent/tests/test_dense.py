@@ -0,0 +1,51 @@
+import asyncio
+
+import dense
+from dense import RoomCounter
+
+
+class FakeJobRequest:
+    def __init__(self, job_id: str):
+        self.id = job_id
+        self.accepted = False
+        self.rejected = False
+
+    async def accept(self):
+        self.accepted = True
+
+    async def reject(self):
+        self.rejected = True
+
+
+def test_room_counter_caps_jobs():
+    counter = RoomCounter(max_rooms=2)
+    assert counter.try_add("job-1")
+    assert counter.try_add("job-2")
+    assert not counter.try_add("job-3")
+    assert counter.load() == 1.0
+
+    counter.remove("job-1")
+    assert counter.load() == 0.5
+    assert counter.try_add("job-3")
+    assert not counter.try_add("job-1")
+
+
+def test_room_counter_counts_a_job_once():
+    counter = RoomCounter(max_rooms=1)
+    assert counter.try_add("job-1")
+    # Re-adding a hosted job never needs another slot
+    assert counter.try_add("job-1")
+    counter.remove("job-1")
+    assert counter.load() == 0.0
+
+
+def test_request_fnc_rejects_jobs_when_full(monkeypatch):
+    monkeypatch.setattr(dense, "rooms", RoomCounter(max_rooms=1))
+    first, second = FakeJobRequest("job-1"), FakeJobRequest("job-2")
+
+    asyncio.run(dense.request_fnc(first))
+    asyncio.run(dense.request_fnc(second))
+
+    assert first.accepted and not first.rejected
+    assert second.rejected and not second.accepted
+    assert dense.rooms.load() == 1.0
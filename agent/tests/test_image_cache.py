@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from image_cache import GeneratedImage, ImageCache
+
+
+class SlowBackend:
+    name = "slow"
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.calls = 0
+
+    async def generate(self, prompt: str, **params) -> GeneratedImage:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return GeneratedImage(data=prompt.encode(), mime_type="image/png")
+
+
+def test_concurrent_requests_share_one_generation():
+    backend = SlowBackend()
+
+    async def main():
+        cache = ImageCache(backend)
+        return await asyncio.gather(
+            cache.get("A tavern"), cache.get("a   TAVERN"), cache.get("A tavern")
+        )
+
+    images = asyncio.run(main())
+    assert backend.calls == 1
+    assert all(image is images[0] for image in images)
+
+
+def test_cancelled_caller_does_not_abort_others():
+    backend = SlowBackend()
+
+    async def main():
+        cache = ImageCache(backend)
+        first = asyncio.create_task(cache.get("A dungeon entrance"))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(cache.get("A dungeon entrance"))
+        await asyncio.sleep(0.01)
+
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    image = asyncio.run(main())
+    assert image.data == b"A dungeon entrance"
+    assert backend.calls == 1
+
+
+def test_reads_back_from_disk(tmp_path):
+    backend = SlowBackend(delay=0)
+
+    async def main():
+        await ImageCache(backend, cache_dir=tmp_path).get("A tavern", size="1024x1024")
+        # A fresh cache has an empty memory tier
+        return await ImageCache(backend, cache_dir=tmp_path).get(
+            "A tavern", size="1024x1024"
+        )
+
+    image = asyncio.run(main())
+    assert image == GeneratedImage(data=b"A tavern", mime_type="image/png")
+    assert backend.calls == 1
@@ -0,0 +1,315 @@
+import asyncio
+import heapq
+import threading
+import time
+
+import pytest
+from livekit.agents import APIStatusError, llm
+
+from llm_scheduler import SCHEDULED_CONN_OPTIONS, LLMScheduler, Priority, _Waiter
+from tool_executor import collect_turn
+
+MODEL = "gpt-4o"
+
+
+def _active(scheduler: LLMScheduler) -> int:
+    return scheduler.metrics()["models"][MODEL]["active"]
+
+
+async def _hold(scheduler: LLMScheduler, priority: Priority, release: asyncio.Event):
+    """Occupy one slot until release is set."""
+
+    async def request():
+        await release.wait()
+
+    await scheduler.run(MODEL, priority, request)
+
+
+def test_admits_waiters_in_priority_order():
+    async def main():
+        scheduler = LLMScheduler(default_limit=1)
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(scheduler, Priority.INTERACTIVE, release))
+        await asyncio.sleep(0)
+
+        order = []
+
+        async def record(priority: Priority):
+            async def request():
+                order.append(priority)
+
+            await scheduler.run(MODEL, priority, request)
+
+        waiters = []
+        for priority in (Priority.BACKGROUND, Priority.SUMMARY, Priority.INTERACTIVE):
+            waiters.append(asyncio.create_task(record(priority)))
+            await asyncio.sleep(0)
+
+        release.set()
+        await asyncio.gather(holder, *waiters)
+        return order
+
+    assert asyncio.run(main()) == [
+        Priority.INTERACTIVE,
+        Priority.SUMMARY,
+        Priority.BACKGROUND,
+    ]
+
+
+def test_keeps_a_slot_for_interactive_requests():
+    async def main():
+        scheduler = LLMScheduler(default_limit=2)
+        release = asyncio.Event()
+        background = [
+            asyncio.create_task(_hold(scheduler, Priority.BACKGROUND, release))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0.01)
+        # The second background request waits on the reserved slot
+        assert _active(scheduler) == 1
+        assert scheduler.metrics()["priorities"]["background"]["queue_depth"] == 1
+
+        async def request():
+            return "answer"
+
+        result = await asyncio.wait_for(
+            scheduler.run(MODEL, Priority.INTERACTIVE, request), timeout=1.0
+        )
+        release.set()
+        await asyncio.gather(*background)
+        return result, _active(scheduler)
+
+    assert asyncio.run(main()) == ("answer", 0)
+
+
+def test_cancel_before_grant_lands_returns_slot():
+    async def main():
+        scheduler = LLMScheduler(default_limit=1)
+        await scheduler._acquire(MODEL, Priority.INTERACTIVE)
+        waiter = asyncio.create_task(scheduler._acquire(MODEL, Priority.INTERACTIVE))
+        await asyncio.sleep(0)
+
+        # Grant the slot and cancel before the wakeup runs on the loop
+        scheduler._release(MODEL)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.sleep(0)
+        return _active(scheduler), scheduler.metrics()["priorities"]["interactive"]
+
+    active, stats = asyncio.run(main())
+    assert active == 0
+    assert stats["queue_depth"] == 0
+
+
+def test_cancel_after_grant_lands_returns_slot():
+    async def main():
+        scheduler = LLMScheduler(default_limit=1)
+        await scheduler._acquire(MODEL, Priority.INTERACTIVE)
+        waiter = asyncio.create_task(scheduler._acquire(MODEL, Priority.INTERACTIVE))
+        await asyncio.sleep(0)
+
+        # Let the wakeup resolve the future, then cancel before the waiter resumes
+        scheduler._release(MODEL)
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return _active(scheduler), scheduler.metrics()["priorities"]["interactive"]
+
+    active, stats = asyncio.run(main())
+    assert active == 0
+    assert stats["queue_depth"] == 0
+
+
+def test_backs_off_on_rate_limit_and_counts_the_request_once():
+    async def main():
+        scheduler = LLMScheduler(default_limit=1, base_backoff=10.0)
+        attempts = []
+
+        async def request():
+            attempts.append(time.monotonic())
+            if len(attempts) == 1:
+                raise APIStatusError(
+                    "Rate limit reached. Please try again in 50ms.", status_code=429
+                )
+            return "ok"
+
+        result = await scheduler.run(MODEL, Priority.INTERACTIVE, request)
+        return result, attempts, scheduler.metrics()
+
+    result, attempts, metrics = asyncio.run(main())
+    assert result == "ok"
+    assert len(attempts) == 2
+    # The server's retry-after wins over the exponential backoff
+    assert 0.05 <= attempts[1] - attempts[0] < 1.0
+    assert metrics["models"][MODEL] == {"active": 0, "limit": 1, "rate_limited": 1}
+    assert metrics["priorities"]["interactive"]["completed"] == 1
+    assert metrics["priorities"]["interactive"]["queue_depth"] == 0
+
+
+class _RateLimitedLLM(llm.LLM):
+    """Answers every request after the first with "ok"; the first gets a 429."""
+
+    def __init__(self):
+        super().__init__()
+        self.attempts = 0
+
+    def chat(self, *, chat_ctx, tools=None, conn_options=SCHEDULED_CONN_OPTIONS, **kwargs):
+        return _RateLimitedStream(
+            self, chat_ctx=chat_ctx, tools=tools or [], conn_options=conn_options
+        )
+
+
+class _RateLimitedStream(llm.LLMStream):
+    async def _run(self):
+        self._llm.attempts += 1
+        if self._llm.attempts == 1:
+            # Rate limits come out of the OpenAI plugin as retryable
+            raise APIStatusError(
+                "Rate limit reached. Please try again in 20ms.",
+                status_code=429,
+                retryable=True,
+            )
+        self._event_ch.send_nowait(
+            llm.ChatChunk(
+                id="1", delta=llm.ChoiceDelta(role="assistant", content="ok")
+            )
+        )
+
+
+def test_backs_off_on_rate_limit_from_an_llm_stream():
+    async def main():
+        scheduler = LLMScheduler(default_limit=1, base_backoff=10.0)
+        model = _RateLimitedLLM()
+        turn = await scheduler.run(
+            MODEL,
+            Priority.INTERACTIVE,
+            lambda: collect_turn(
+                model.chat(
+                    chat_ctx=llm.ChatContext(), conn_options=SCHEDULED_CONN_OPTIONS
+                )
+            ),
+        )
+        return turn, model.attempts, scheduler.metrics()
+
+    turn, attempts, metrics = asyncio.run(main())
+    assert turn.text == "ok"
+    assert attempts == 2
+    assert metrics["models"][MODEL] == {"active": 0, "limit": 1, "rate_limited": 1}
+
+
+def test_retries_other_retryable_errors_without_blocking_the_model():
+    async def main():
+        scheduler = LLMScheduler(default_limit=1, base_backoff=0.01)
+        attempts = 0
+
+        async def request():
+            nonlocal attempts
+            attempts += 1
+            if attempts == 1:
+                raise APIStatusError("Bad gateway", status_code=502)
+            return "ok"
+
+        result = await scheduler.run(MODEL, Priority.INTERACTIVE, request)
+        return result, attempts, scheduler.metrics()
+
+    result, attempts, metrics = asyncio.run(main())
+    assert (result, attempts) == ("ok", 2)
+    assert metrics["models"][MODEL]["rate_limited"] == 0
+
+
+def test_does_not_retry_client_errors():
+    async def main():
+        scheduler = LLMScheduler(default_limit=1, base_backoff=0.01)
+        attempts = 0
+
+        async def request():
+            nonlocal attempts
+            attempts += 1
+            raise APIStatusError("Invalid request", status_code=400)
+
+        with pytest.raises(APIStatusError):
+            await scheduler.run(MODEL, Priority.INTERACTIVE, request)
+        return attempts
+
+    assert asyncio.run(main()) == 1
+
+
+def test_gives_up_after_max_retries():
+    async def main():
+        scheduler = LLMScheduler(default_limit=1, max_retries=2, base_backoff=0.01)
+        attempts = 0
+
+        async def request():
+            nonlocal attempts
+            attempts += 1
+            raise APIStatusError("Too many requests", status_code=429)
+
+        with pytest.raises(APIStatusError):
+            await scheduler.run(MODEL, Priority.SUMMARY, request)
+        return attempts, scheduler.metrics()
+
+    attempts, metrics = asyncio.run(main())
+    assert attempts == 3
+    assert metrics["models"][MODEL]["active"] == 0
+    assert metrics["priorities"]["summary"]["completed"] == 1
+
+
+def test_skips_waiters_on_closed_loops():
+    closed = asyncio.new_event_loop()
+    closed.close()
+
+    async def main():
+        scheduler = LLMScheduler(default_limit=1)
+        await scheduler._acquire(MODEL, Priority.INTERACTIVE)
+        with scheduler._lock:
+            state = scheduler._state(MODEL)
+            heapq.heappush(
+                state.waiters,
+                _Waiter(Priority.INTERACTIVE, -1, closed, closed.create_future()),
+            )
+        scheduler._release(MODEL)
+        assert _active(scheduler) == 0
+
+        async def request():
+            return "ok"
+
+        return await asyncio.wait_for(
+            scheduler.run(MODEL, Priority.INTERACTIVE, request), timeout=1.0
+        )
+
+    assert asyncio.run(main()) == "ok"
+
+
+def test_shares_slots_across_threads():
+    scheduler = LLMScheduler(default_limit=1)
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    async def request():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        with lock:
+            running -= 1
+
+    def room():
+        async def main():
+            for _ in range(5):
+                await scheduler.run(MODEL, Priority.INTERACTIVE, request)
+
+        asyncio.run(main())
+
+    threads = [threading.Thread(target=room) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert peak == 1
+    assert scheduler.metrics()["priorities"]["interactive"]["completed"] == 20
+    assert scheduler.metrics()["models"][MODEL]["active"] == 0
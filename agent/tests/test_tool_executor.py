@@ -0,0 +1,114 @@
+import asyncio
+import json
+
+from livekit.agents import function_tool, llm
+
+from tool_executor import ToolExecutor
+
+
+class Tools:
+    def __init__(self):
+        self.direct_sends: list[str] = []
+        self.batches: list[list[dict]] = []
+        self.chain: list[str] = []
+
+    @function_tool(description="Send a private message")
+    async def send_private_message(self, identity: str, message: str):
+        self.direct_sends.append(identity)
+        return f"Message sent to {identity}"
+
+    async def send_private_messages(self, calls: list[dict]) -> list[str]:
+        self.batches.append(calls)
+        return [f"Batched to {call['identity']}" for call in calls]
+
+    @function_tool(description="Create a poll")
+    async def create_poll(self, question: str):
+        # Yield so an unordered run would interleave with show_popup
+        await asyncio.sleep(0.01)
+        self.chain.append(f"poll:{question}")
+        return "Poll created"
+
+    @function_tool(description="Show a popup")
+    async def show_popup(self, message: str):
+        self.chain.append(f"popup:{message}")
+        return "Popup shown"
+
+    @function_tool(description="Generate an image")
+    async def generate_image(self, prompt: str):
+        await asyncio.sleep(1.0)
+        return "Image shown"
+
+
+def _call(call_id: str, name: str, **arguments) -> llm.FunctionToolCall:
+    return llm.FunctionToolCall(
+        call_id=call_id, name=name, arguments=json.dumps(arguments)
+    )
+
+
+def _executor(tools: Tools) -> ToolExecutor:
+    return ToolExecutor(
+        llm.find_function_tools(tools),
+        default_timeout=1.0,
+        timeouts={"generate_image": 0.05},
+        batch_handlers={"send_private_message": tools.send_private_messages},
+        sequential={"create_poll", "show_popup"},
+    )
+
+
+def test_batches_calls_to_one_tool_into_a_single_handler_call():
+    tools = Tools()
+    calls = [
+        _call(f"c{i}", "send_private_message", identity=f"p{i}", message="hi")
+        for i in range(8)
+    ]
+
+    outputs = asyncio.run(_executor(tools).execute(calls))
+
+    assert tools.direct_sends == []
+    assert len(tools.batches) == 1
+    assert tools.batches[0] == [{"identity": f"p{i}", "message": "hi"} for i in range(8)]
+    assert [output.call_id for output in outputs] == [f"c{i}" for i in range(8)]
+    assert outputs[3].output == "Batched to p3"
+    assert not any(output.is_error for output in outputs)
+
+
+def test_applies_per_tool_timeouts():
+    tools = Tools()
+    calls = [
+        _call("img", "generate_image", prompt="a tavern"),
+        _call("popup", "show_popup", message="hello"),
+    ]
+
+    outputs = asyncio.run(_executor(tools).execute(calls))
+
+    assert outputs[0].is_error
+    assert outputs[0].output == "generate_image timed out after 0.05s"
+    assert not outputs[1].is_error
+
+
+def test_runs_sequential_tools_in_emit_order():
+    tools = Tools()
+    calls = [
+        _call("c1", "create_poll", question="left or right?"),
+        _call("c2", "show_popup", message="vote now"),
+        _call("c3", "create_poll", question="fight or flee?"),
+    ]
+
+    outputs = asyncio.run(_executor(tools).execute(calls))
+
+    assert tools.chain == ["poll:left or right?", "popup:vote now", "poll:fight or flee?"]
+    assert [output.call_id for output in outputs] == ["c1", "c2", "c3"]
+
+
+def test_reports_unknown_tools_and_invalid_arguments():
+    tools = Tools()
+    calls = [
+        _call("c1", "cast_spell", target="goblin"),
+        llm.FunctionToolCall(call_id="c2", name="show_popup", arguments="{}"),
+    ]
+
+    outputs = asyncio.run(_executor(tools).execute(calls))
+
+    assert outputs[0].output == "Unknown tool: cast_spell"
+    assert outputs[1].is_error
+    assert outputs[1].output.startswith("Invalid arguments for show_popup")
@@ -0,0 +1,88 @@
+import asyncio
+import os
+import time
+
+from livekit.agents import llm
+
+from transcript import TranscriptStore
+
+LINES = [
+    ("alice", "Héllo, wanderer — où est la taverne?"),
+    ("bob", "Это подземелье 🐉"),
+    ("alice", "東の扉を開けよう"),
+]
+
+
+def _lines(chat_context: llm.ChatContext) -> list[str]:
+    """Transcript lines inside the per-participant messages of chat_context."""
+    lines = []
+    for item in chat_context.items:
+        body = item.text_content.split("Message: ```", 1)[1].removesuffix("```")
+        lines.extend(body.splitlines())
+    return lines
+
+
+async def _fill(store: TranscriptStore, count: int) -> list[tuple[str, str, float]]:
+    written = []
+    start = time.time()
+    for i in range(count):
+        speaker, text = LINES[i % len(LINES)]
+        text = f"{text} #{i}"
+        await store.append(speaker, text, created_at=start + i)
+        written.append((speaker, text, start + i))
+    return written
+
+
+def test_spills_and_reloads_segments(tmp_path):
+    async def main():
+        store = TranscriptStore(
+            segment_size=4, max_memory_bytes=512, spill_dir=str(tmp_path)
+        )
+        written = await _fill(store, 30)
+        segments = [*await store.load_spilled(), *store._segments]
+        read = [
+            (entry.speaker, entry.text, entry.created_at)
+            for entry in store.entries(segments=segments)
+        ]
+        return store, written, read
+
+    store, written, read = asyncio.run(main())
+    stats = store.memory_stats()
+    assert stats["spilled_segments"] > 0
+    assert stats["memory_bytes"] <= 512
+    assert stats["entries"] == len(store) == 30
+    assert read == written
+
+    store.close()
+    assert os.listdir(tmp_path) == []
+
+
+def test_full_chat_context_includes_spilled_entries(tmp_path):
+    async def main():
+        store = TranscriptStore(
+            segment_size=4, max_memory_bytes=512, spill_dir=str(tmp_path)
+        )
+        await _fill(store, 30)
+        return store, store.to_chat_context(), await store.to_full_chat_context()
+
+    store, recent, full = asyncio.run(main())
+    spilled = sum(size for _, size in store._spilled)
+    assert len(_lines(full)) == 30
+    assert len(_lines(recent)) == 30 - spilled
+    # One message per participant
+    assert len(full.items) == 2
+    store.close()
+
+
+def test_merges_transcript_after_existing_context():
+    async def main():
+        store = TranscriptStore()
+        context = llm.ChatContext()
+        context.add_message(role="system", content="You are the game master.")
+        await _fill(store, 3)
+        return store.to_chat_context(context), store.to_chat_context(speaker="bob")
+
+    merged, bob = asyncio.run(main())
+    assert merged.items[0].role == "system"
+    assert len(merged.items) == 3
+    assert _lines(bob) == ["Это подземелье 🐉 #1"]
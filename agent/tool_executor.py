@@ -0,0 +1,185 @@
+import asyncio
+import inspect
+import logging
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, Awaitable, Callable
+
+from livekit.agents import llm
+from livekit.agents.llm.tool_context import (
+    get_function_info,
+    get_raw_function_info,
+    is_raw_function_tool,
+)
+from livekit.agents.llm.utils import prepare_function_arguments
+
+logger = logging.getLogger("transcriber")
+
+# A batch handler receives the validated arguments, by name, of every call to
+# one tool in a turn and returns one output string per call, in the same order.
+BatchHandler = Callable[[list[dict[str, Any]]], Awaitable[list[str]]]
+
+
+@dataclass
+class LLMTurn:
+    """Text and tool calls collected from a single streamed LLM response."""
+
+    text: str = ""
+    tool_calls: list[llm.FunctionToolCall] = field(default_factory=list)
+
+
+async def collect_turn(stream: AsyncIterable[llm.ChatChunk]) -> LLMTurn:
+    """Drain an LLM stream, accumulating text content and tool calls."""
+    turn = LLMTurn()
+    async for chunk in stream:
+        if not chunk.delta:
+            continue
+        if chunk.delta.content:
+            turn.text += chunk.delta.content
+        if chunk.delta.tool_calls:
+            turn.tool_calls.extend(chunk.delta.tool_calls)
+    return turn
+
+
+def _tool_name(tool: llm.FunctionTool | llm.RawFunctionTool) -> str:
+    if is_raw_function_tool(tool):
+        return get_raw_function_info(tool).name
+    return get_function_info(tool).name
+
+
+class ToolExecutor:
+    """Runs the tool calls of an LLM turn, each bounded by a timeout.
+
+    Calls to `sequential` tools (ones that mutate shared state or are visible
+    to users in order) run one at a time in the order the model emitted them;
+    all other calls run concurrently alongside that chain. Calls to tools
+    registered with a batch handler are grouped and handed to the handler in
+    one go, so fan-out tools (e.g. private messages to many players) can be
+    collapsed into a single send.
+    """
+
+    def __init__(
+        self,
+        tools: list[llm.FunctionTool | llm.RawFunctionTool],
+        *,
+        default_timeout: float = 10.0,
+        timeouts: dict[str, float] | None = None,
+        batch_handlers: dict[str, BatchHandler] | None = None,
+        sequential: set[str] | None = None,
+    ):
+        self.tools = list(tools)
+        self._tools_by_name = {_tool_name(tool): tool for tool in self.tools}
+        self._default_timeout = default_timeout
+        self._timeouts = timeouts or {}
+        self._batch_handlers = batch_handlers or {}
+        self._sequential = sequential or set()
+
+    def timeout_for(self, name: str) -> float:
+        return self._timeouts.get(name, self._default_timeout)
+
+    async def execute(
+        self, tool_calls: list[llm.FunctionToolCall]
+    ) -> list[llm.FunctionCallOutput]:
+        """Execute all tool calls and return their outputs in call order."""
+        outputs: dict[str, llm.FunctionCallOutput] = {}
+        batches: dict[str, list[tuple[llm.FunctionToolCall, dict[str, Any]]]] = {}
+        single: list[tuple[llm.FunctionToolCall, Any, tuple, dict[str, Any]]] = []
+        chain: list[tuple[llm.FunctionToolCall, Any, tuple, dict[str, Any]]] = []
+
+        for call in tool_calls:
+            tool = self._tools_by_name.get(call.name)
+            if tool is None:
+                outputs[call.call_id] = self._error(call, f"Unknown tool: {call.name}")
+                continue
+            try:
+                args, kwargs = prepare_function_arguments(
+                    fnc=tool, json_arguments=call.arguments
+                )
+            except Exception as e:
+                logger.warning(f"Invalid arguments for tool {call.name}: {e}")
+                outputs[call.call_id] = self._error(
+                    call, f"Invalid arguments for {call.name}: {e}"
+                )
+                continue
+
+            if call.name in self._sequential:
+                chain.append((call, tool, args, kwargs))
+            elif call.name in self._batch_handlers:
+                # prepare_function_arguments passes every argument positionally;
+                # batch handlers get them by name
+                arguments = inspect.signature(tool).bind(*args, **kwargs).arguments
+                batches.setdefault(call.name, []).append((call, dict(arguments)))
+            else:
+                single.append((call, tool, args, kwargs))
+
+        results = await asyncio.gather(
+            self._run_chain(chain),
+            *[self._run_single(call, tool, args, kwargs) for call, tool, args, kwargs in single],
+            *[self._run_batch(name, calls) for name, calls in batches.items()],
+        )
+        for result in results:
+            for output in result if isinstance(result, list) else [result]:
+                outputs[output.call_id] = output
+
+        return [outputs[call.call_id] for call in tool_calls]
+
+    async def _run_chain(
+        self, calls: list[tuple[llm.FunctionToolCall, Any, tuple, dict[str, Any]]]
+    ) -> list[llm.FunctionCallOutput]:
+        return [
+            await self._run_single(call, tool, args, kwargs)
+            for call, tool, args, kwargs in calls
+        ]
+
+    async def _run_single(
+        self,
+        call: llm.FunctionToolCall,
+        tool: llm.FunctionTool | llm.RawFunctionTool,
+        args: tuple,
+        kwargs: dict[str, Any],
+    ) -> llm.FunctionCallOutput:
+        try:
+            result = await asyncio.wait_for(
+                tool(*args, **kwargs), timeout=self.timeout_for(call.name)
+            )
+        except Exception as e:
+            return self._failure(call, e)
+        return self._ok(call, result)
+
+    async def _run_batch(
+        self, name: str, calls: list[tuple[llm.FunctionToolCall, dict[str, Any]]]
+    ) -> list[llm.FunctionCallOutput]:
+        logger.info(f"Batching {len(calls)} calls to {name}")
+        try:
+            results = await asyncio.wait_for(
+                self._batch_handlers[name]([kwargs for _, kwargs in calls]),
+                timeout=self.timeout_for(name),
+            )
+        except Exception as e:
+            return [self._failure(call, e) for call, _ in calls]
+        return [self._ok(call, result) for (call, _), result in zip(calls, results)]
+
+    def _ok(self, call: llm.FunctionToolCall, result: Any) -> llm.FunctionCallOutput:
+        return llm.FunctionCallOutput(
+            name=call.name,
+            call_id=call.call_id,
+            output="" if result is None else str(result),
+            is_error=False,
+        )
+
+    def _failure(
+        self, call: llm.FunctionToolCall, exc: BaseException
+    ) -> llm.FunctionCallOutput:
+        if isinstance(exc, asyncio.TimeoutError):
+            logger.warning(f"Tool {call.name} timed out")
+            return self._error(
+                call, f"{call.name} timed out after {self.timeout_for(call.name)}s"
+            )
+        if isinstance(exc, llm.ToolError):
+            return self._error(call, exc.message)
+        logger.error(f"Tool {call.name} failed: {exc}")
+        return self._error(call, "An internal error occurred")
+
+    def _error(self, call: llm.FunctionToolCall, message: str) -> llm.FunctionCallOutput:
+        return llm.FunctionCallOutput(
+            name=call.name, call_id=call.call_id, output=message, is_error=True
+        )
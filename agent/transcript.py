@@ -0,0 +1,232 @@
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Iterator
+
+from livekit.agents import llm
+
+logger = logging.getLogger("transcriber")
+
+
+class _Segment:
+    """Fixed-capacity columnar block of transcript entries.
+
+    Speakers are interned ids, and all texts share one utf-8 buffer indexed by
+    an offsets column, so an entry costs a few machine words plus its bytes
+    instead of a full ChatMessage.
+    """
+
+    def __init__(self):
+        self.speakers = array("I")
+        self.timestamps = array("d")
+        self.offsets = array("Q", [0])
+        self.text = bytearray()
+
+    def __len__(self) -> int:
+        return len(self.speakers)
+
+    def append(self, speaker_id: int, text: str, created_at: float):
+        self.speakers.append(speaker_id)
+        self.timestamps.append(created_at)
+        self.text += text.encode()
+        self.offsets.append(len(self.text))
+
+    def nbytes(self) -> int:
+        return sum(
+            len(col) * col.itemsize
+            for col in (self.speakers, self.timestamps, self.offsets)
+        ) + len(self.text)
+
+    def write(self, path: str):
+        with open(path, "wb") as f:
+            self.speakers.tofile(f)
+            self.timestamps.tofile(f)
+            self.offsets.tofile(f)
+            f.write(self.text)
+
+    @classmethod
+    def read(cls, path: str, size: int) -> "_Segment":
+        segment = cls()
+        segment.offsets = array("Q")
+        with open(path, "rb") as f:
+            segment.speakers.fromfile(f, size)
+            segment.timestamps.fromfile(f, size)
+            segment.offsets.fromfile(f, size + 1)
+            segment.text = bytearray(f.read())
+        return segment
+
+    def rows(self) -> Iterator[tuple[int, float, str]]:
+        for i in range(len(self.speakers)):
+            text = self.text[self.offsets[i] : self.offsets[i + 1]].decode()
+            yield self.speakers[i], self.timestamps[i], text
+
+
+@dataclass
+class TranscriptEntry:
+    speaker: str
+    text: str
+    created_at: float
+
+
+def chat_context_bytes(chat_context: llm.ChatContext) -> int:
+    """Approximate payload size of a ChatContext: message text, tool arguments and outputs."""
+    total = 0
+    for item in chat_context.items:
+        if item.type == "message":
+            total += sum(len(c) for c in item.content if isinstance(c, str))
+        elif item.type == "function_call":
+            total += len(item.name) + len(item.arguments)
+        elif item.type == "function_call_output":
+            total += len(item.output)
+    return total
+
+
+class TranscriptStore:
+    """Append-only room transcript with memory accounting and disk spill.
+
+    Entries are only materialized into an llm.ChatContext when a prompt is
+    built. Once the in-memory segments exceed `max_memory_bytes`, the oldest
+    sealed segments are written to disk off the event loop; they are still
+    loaded for full transcripts (summaries) but left out of coordinator prompts.
+    """
+
+    def __init__(
+        self,
+        *,
+        segment_size: int = 256,
+        max_memory_bytes: int = 4 * 1024 * 1024,
+        spill_dir: str | None = None,
+    ):
+        self._segment_size = segment_size
+        self._max_memory_bytes = max_memory_bytes
+        self._spill_root = spill_dir
+        self._spill_dir: str | None = None
+        self._speakers: list[str] = []
+        self._speaker_ids: dict[str, int] = {}
+        self._segments: list[_Segment] = [_Segment()]
+        self._spilled: list[tuple[str, int]] = []  # (path, entries)
+        self._spill_lock = asyncio.Lock()
+        self._spilled_entries = 0
+        self._spilled_bytes = 0
+
+    def __len__(self) -> int:
+        return self._spilled_entries + sum(len(seg) for seg in self._segments)
+
+    def _intern(self, speaker: str) -> int:
+        if (speaker_id := self._speaker_ids.get(speaker)) is None:
+            speaker_id = self._speaker_ids[speaker] = len(self._speakers)
+            self._speakers.append(speaker)
+        return speaker_id
+
+    async def append(self, speaker: str, text: str, created_at: float | None = None):
+        segment = self._segments[-1]
+        if len(segment) >= self._segment_size:
+            segment = _Segment()
+            self._segments.append(segment)
+        segment.append(
+            self._intern(speaker), text, time.time() if created_at is None else created_at
+        )
+        # A spill already in progress will pick up the new excess when it loops
+        if self.memory_bytes() > self._max_memory_bytes and not self._spill_lock.locked():
+            await self._spill()
+
+    def memory_bytes(self) -> int:
+        return sum(seg.nbytes() for seg in self._segments) + sum(
+            len(s) for s in self._speakers
+        )
+
+    def memory_stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self),
+            "speakers": len(self._speakers),
+            "memory_bytes": self.memory_bytes(),
+            "spilled_segments": len(self._spilled),
+            "spilled_bytes": self._spilled_bytes,
+        }
+
+    async def _spill(self):
+        async with self._spill_lock:
+            # Never spill the segment currently being written to
+            while (
+                len(self._segments) > 1
+                and self.memory_bytes() > self._max_memory_bytes
+            ):
+                # The segment stays readable in memory until it is on disk
+                segment = self._segments[0]
+                if self._spill_dir is None:
+                    self._spill_dir = await asyncio.to_thread(
+                        tempfile.mkdtemp, prefix="transcript-", dir=self._spill_root
+                    )
+                path = os.path.join(self._spill_dir, f"{len(self._spilled)}.seg")
+                await asyncio.to_thread(segment.write, path)
+                self._segments.pop(0)
+                self._spilled.append((path, len(segment)))
+                self._spilled_entries += len(segment)
+                self._spilled_bytes += segment.nbytes()
+                logger.info(f"Spilled transcript segment to {path}")
+
+    async def load_spilled(self) -> list[_Segment]:
+        """Read every spilled segment back from disk, off the event loop."""
+        spilled = list(self._spilled)
+        return await asyncio.to_thread(
+            lambda: [_Segment.read(path, size) for path, size in spilled]
+        )
+
+    def entries(
+        self,
+        *,
+        speaker: str | None = None,
+        segments: list[_Segment] | None = None,
+    ) -> Iterator[TranscriptEntry]:
+        """Iterate entries of the given segments, by default the in-memory ones."""
+        if segments is None:
+            segments = list(self._segments)
+        speaker_id = self._speaker_ids.get(speaker) if speaker is not None else None
+        for segment in segments:
+            for sid, created_at, text in segment.rows():
+                if speaker is None or sid == speaker_id:
+                    yield TranscriptEntry(self._speakers[sid], text, created_at)
+
+    def to_chat_context(
+        self,
+        chat_context: llm.ChatContext | None = None,
+        *,
+        speaker: str | None = None,
+        segments: list[_Segment] | None = None,
+    ) -> llm.ChatContext:
+        """Build a ChatContext with one message per participant, merged into chat_context."""
+        combined_context = llm.ChatContext()
+        if chat_context:
+            for item in chat_context.items:
+                combined_context.insert(item=item)
+
+        by_speaker: dict[str, list[TranscriptEntry]] = {}
+        for entry in self.entries(speaker=speaker, segments=segments):
+            by_speaker.setdefault(entry.speaker, []).append(entry)
+
+        for participant_identity, entries in by_speaker.items():
+            msg = "".join(entry.text + "\n" for entry in entries)
+            combined_context.add_message(
+                role="user",
+                content=f"Participant Name: {participant_identity}\nMessage: ```{msg}```",
+                created_at=entries[-1].created_at,
+            )
+
+        return combined_context
+
+    async def to_full_chat_context(
+        self, chat_context: llm.ChatContext | None = None
+    ) -> llm.ChatContext:
+        """Like to_chat_context, but including the segments spilled to disk."""
+        segments = [*await self.load_spilled(), *self._segments]
+        return self.to_chat_context(chat_context, segments=segments)
+
+    def close(self):
+        if self._spill_dir:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None